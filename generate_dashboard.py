@@ -10,17 +10,35 @@ DATA:
 
 OUTPUT:
 - AI_Prediction_Engine.html
+- per-league debug counters on stderr when DASH_DEBUG is set (always in the HTML)
 """
 
 import os
 import re
+import sys
 import json
 import math
 import time
 import difflib
+import heapq
+import bisect
+import hashlib
+import functools
+import itertools
+import threading
 import requests
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from datetime import datetime as dt, timezone
-from typing import Dict, Any, Optional, Tuple, List
+from urllib.parse import urlsplit
+from typing import Callable, Dict, Any, Optional, Tuple, List
+
+try:
+    import orjson  # optional: faster parsing of the big Odds/ESPN payloads
+except ImportError:
+    orjson = None
 
 # =============================================================================
 # REQUIRED SECRET
@@ -67,6 +85,7 @@ NFL_MARKETS = [
 ]
 
 MAIN_LINE_MARKETS = ["spreads", "totals"]  # for blowout/script
+MAIN_LINE_MARKET_SET = frozenset(MAIN_LINE_MARKETS)
 
 NBA_MARKET_TO_PROP = {
     "player_points": "points",
@@ -98,6 +117,8 @@ NFL_MARKET_TO_PROP = {
 # ESPN endpoints
 ESPN_NBA_TEAMS = "https://site.api.espn.com/apis/site/v2/sports/basketball/nba/teams"
 ESPN_NFL_TEAMS = "https://site.api.espn.com/apis/site/v2/sports/football/nfl/teams"
+ESPN_NBA_ATHLETES = "https://site.api.espn.com/apis/site/v2/sports/basketball/nba/athletes"
+ESPN_NFL_ATHLETES = "https://site.api.espn.com/apis/site/v2/sports/football/nfl/athletes"
 
 # Cache files
 CACHE_DIR = ".cache"
@@ -105,13 +126,48 @@ PLAYER_INDEX_CACHE = os.path.join(CACHE_DIR, "espn_player_index.json")
 INJURY_CACHE = os.path.join(CACHE_DIR, "espn_injuries.json")
 PLAYER_STATS_CACHE = os.path.join(CACHE_DIR, "espn_player_stats.json")
 
-REQUEST_SLEEP = 0.12
+# Odds API response cache TTLs (seconds); reruns inside the window reuse responses
+ODDS_EVENTS_TTL = 60
+ODDS_EVENT_ODDS_TTL = 30
+ESPN_TEAMS_TTL = 12 * 3600  # team lists change a few times a season
+ESPN_INJURIES_TTL = 300
+# If a refetch fails, a cached copy up to this old is served instead of failing
+ODDS_STALE_TTL = 30 * 60
+ESPN_STALE_TTL = 24 * 3600
+ESPN_INJURIES_STALE_TTL = 2 * 3600  # a day-old injury list is worse than none
+# Response cache files older than every TTL above are deleted at the end of a run
+RESPONSE_CACHE_MAX_AGE = max(ODDS_STALE_TTL, ESPN_STALE_TTL, ESPN_TEAMS_TTL)
+
+HTTP_POOL_SIZE = 32  # ESPN_MAX_IN_FLIGHT + ODDS_FETCH_WORKERS, with headroom
+ODDS_FETCH_WORKERS = 8  # Odds API calls in flight across both leagues; it rate-limits bursts
+ESPN_FETCH_WORKERS = 16
+ESPN_MAX_IN_FLIGHT = 8  # ESPN calls in flight across both leagues; replaces the old per-call sleep
+HTTP_RETRIES = 3  # transient 429/5xx only, with backoff
+BREAKER_FAILURES = 5  # consecutive connection/5xx failures before an endpoint family is skipped
+BREAKER_COOLDOWN = 60  # seconds to fail fast before one probe request is let through
+LEAGUE_WORKERS = 2  # NBA and NFL are built side by side
+PLAYER_STATS_MEMO_SIZE = 2048  # players with props on one slate, both leagues
 FUZZY_CUTOFF = 0.86  # if mapping fails too much, drop to 0.82
 
+# Any of these substrings (any case) in an ESPN injury status => treat player as out
+INJURY_STATUS_RE = re.compile(r"OUT|INACTIVE|DOUBTFUL|IR|DNP|SUSP|PUP", re.IGNORECASE)
+
 # =============================================================================
 # UTIL
 # =============================================================================
 
+# One pooled session shared by all threads so TCP/TLS connections get reused
+SESSION = requests.Session()
+SESSION.headers.update({"User-Agent": "Mozilla/5.0"})
+SESSION.mount("https://", HTTPAdapter(
+    pool_connections=HTTP_POOL_SIZE,
+    pool_maxsize=HTTP_POOL_SIZE,
+    # raise_on_status=False: the last response comes back and raise_for_status() reports it as before.
+    # connect/read=0: timeouts and refused connections are not retried; they count toward the breaker
+    max_retries=Retry(total=HTTP_RETRIES, connect=0, read=0, status=HTTP_RETRIES, backoff_factor=0.3,
+                      status_forcelist=(429, 500, 502, 503, 504), raise_on_status=False),
+))
+
 def ensure_cache_dir():
     os.makedirs(CACHE_DIR, exist_ok=True)
 
@@ -119,36 +175,231 @@ def clamp(x: float, lo: float, hi: float) -> float:
     return max(lo, min(hi, x))
 
 def sigmoid(x: float) -> float:
-    return 1.0 / (1.0 + math.exp(-x))
+    # tanh form: one libm call, no overflow for large |x|
+    return 0.5 * (1.0 + math.tanh(0.5 * x))
+
+def _response_json(r: requests.Response) -> Any:
+    return orjson.loads(r.content) if orjson is not None else r.json()
+
+# breaker key -> (consecutive failures, time of last failure, probe in flight)
+_BREAKER: Dict[str, Tuple[int, float, bool]] = {}
+_BREAKER_LOCK = threading.Lock()
+
+# _get_json only serves ESPN; shared so both leagues' fan-outs don't double the burst
+_ESPN_SLOTS = threading.BoundedSemaphore(ESPN_MAX_IN_FLIGHT)
+
+def _is_transient(e: BaseException) -> bool:
+    """
+    Connection error, timeout or 5xx: worth retrying later. A 4xx (e.g. a bad
+    team id) is an answer, not an outage.
+    """
+    if not isinstance(e, requests.RequestException):
+        return False
+    return e.response is None or e.response.status_code >= 500
+
+def _breaker_key(url: str) -> str:
+    """
+    Host + path up to the endpoint family (".../nba/teams", ".../nfl/athletes"),
+    so a failing family doesn't fail fast the other league or endpoints.
+    """
+    parts = urlsplit(url)
+    segs = parts.path.split("/")
+    for i, seg in enumerate(segs):
+        if seg in ("teams", "athletes"):
+            return parts.netloc + "/".join(segs[:i + 1])
+    return parts.netloc
+
+def _breaker_wait(url: str) -> Optional[float]:
+    """
+    None if url's breaker is closed, else seconds until it lets a probe through.
+    """
+    with _BREAKER_LOCK:
+        failures, last, _probing = _BREAKER.get(_breaker_key(url), (0, 0.0, False))
+    if failures < BREAKER_FAILURES:
+        return None
+    return max(0.0, BREAKER_COOLDOWN - (time.time() - last))
 
 def _get_json(url: str, params: dict | None = None, timeout: int = 20) -> dict:
-    headers = {"User-Agent": "Mozilla/5.0"}
-    r = requests.get(url, params=params, timeout=timeout, headers=headers)
-    r.raise_for_status()
-    time.sleep(REQUEST_SLEEP)
-    return r.json()
+    """
+    GET + decode. An endpoint family that keeps timing out / 5xx-ing is failed
+    fast for BREAKER_COOLDOWN seconds instead of costing a full timeout per
+    call; then a single probe decides whether it closes again (half-open).
+    Any response that isn't a 5xx, 4xx included, resets the count.
+    """
+    key = _breaker_key(url)
+    with _BREAKER_LOCK:
+        failures, last, probing = _BREAKER.get(key, (0, 0.0, False))
+        if failures >= BREAKER_FAILURES:
+            if probing or time.time() - last < BREAKER_COOLDOWN:
+                raise requests.ConnectionError(f"circuit open for {key}")
+            _BREAKER[key] = (failures, last, True)  # this call is the probe
 
+    try:
+        with _ESPN_SLOTS:
+            r = SESSION.get(url, params=params, timeout=timeout)
+        r.raise_for_status()
+    except requests.RequestException as e:
+        with _BREAKER_LOCK:
+            if _is_transient(e):
+                n, _, _ = _BREAKER.get(key, (0, 0.0, False))
+                _BREAKER[key] = (n + 1, time.time(), False)
+            else:
+                _BREAKER.pop(key, None)
+        raise
+
+    # unconditionally: other threads may have added failures since `failures` was read
+    with _BREAKER_LOCK:
+        _BREAKER.pop(key, None)
+    return _response_json(r)
+
+# Cache files are machine-read only: compact, and via orjson when available
 def load_json(path: str) -> dict:
     try:
+        if orjson is not None:
+            with open(path, "rb") as f:
+                return orjson.loads(f.read())
         with open(path, "r", encoding="utf-8") as f:
             return json.load(f)
     except Exception:
         return {}
 
 def save_json(path: str, obj: dict):
+    if orjson is not None:
+        with open(path, "wb") as f:
+            f.write(orjson.dumps(obj))
+        return
     with open(path, "w", encoding="utf-8") as f:
-        json.dump(obj, f, ensure_ascii=False, indent=2)
+        json.dump(obj, f, ensure_ascii=False, separators=(",", ":"))
+
+# Both leagues share the index/injury cache files; serialize their read-modify-write
+_CACHE_FILE_LOCK = threading.Lock()
+
+def update_json(path: str, key: str, value: Any):
+    with _CACHE_FILE_LOCK:
+        data = load_json(path)
+        data[key] = value
+        save_json(path, data)
+
+_RESPONSE_CACHE: Dict[str, Tuple[float, Any]] = {}
+
+# File prefix per key namespace; "get:" keys are ESPN URLs
+_CACHE_PREFIXES = {"events": "odds", "odds": "odds", "get": "espn"}
+_RE_CACHE_FILE = re.compile(r"^(?:odds|espn)_[0-9a-f]{40}\.json$")
+
+def _cache_path(key: str) -> str:
+    prefix = _CACHE_PREFIXES.get(key.split(":", 1)[0], "odds")
+    return os.path.join(CACHE_DIR, f"{prefix}_{hashlib.sha1(key.encode('utf-8')).hexdigest()}.json")
+
+def prune_response_cache(max_age: float):
+    """
+    Deletes response cache files not written in max_age seconds (one file per
+    URL/event, so the directory otherwise grows every day).
+    """
+    try:
+        names = os.listdir(CACHE_DIR)
+    except OSError:
+        return
+    cutoff = time.time() - max_age
+    for name in names:
+        if not _RE_CACHE_FILE.match(name):
+            continue
+        path = os.path.join(CACHE_DIR, name)
+        try:
+            if os.path.getmtime(path) < cutoff:
+                os.remove(path)
+        except OSError:
+            pass
+
+def _cache_lookup(key: str) -> Optional[Tuple[float, Any]]:
+    """
+    In-memory first, then on-disk. Returns (fetched_at, value) or None.
+    """
+    hit = _RESPONSE_CACHE.get(key)
+    if hit is None:
+        data = load_json(_cache_path(key))
+        if "_fetched_at" not in data:
+            return None
+        hit = (float(data["_fetched_at"]), data.get("value"))
+        _RESPONSE_CACHE[key] = hit
+    return hit
+
+def _cache_get(key: str, ttl: float) -> Optional[Any]:
+    """
+    Returns None when missing or older than ttl.
+    """
+    hit = _cache_lookup(key)
+    if hit is None or time.time() - hit[0] > ttl:
+        return None
+    return hit[1]
+
+def _cache_put(key: str, value: Any):
+    fetched_at = time.time()
+    _RESPONSE_CACHE[key] = (fetched_at, value)
+    ensure_cache_dir()
+    save_json(_cache_path(key), {"_fetched_at": fetched_at, "value": value})
+
+def _cached_fetch(key: str, ttl: float, fetch: Callable[[], Any], stale_ttl: float = 0.0,
+                  refresh: bool = False) -> Tuple[Any, bool]:
+    """
+    Returns (value, stale). Cached value if younger than ttl, else fetch() and
+    store it. If fetch() fails with a RequestException or an undecodable body
+    (ValueError), a cached copy younger than stale_ttl is returned with
+    stale=True instead of raising. refresh=True skips the fresh-cache check.
+    """
+    if not refresh:
+        cached = _cache_get(key, ttl)
+        if cached is not None:
+            return cached, False
+
+    try:
+        value = fetch()
+    except (requests.RequestException, ValueError) as e:
+        hit = _cache_lookup(key)
+        if hit is None or time.time() - hit[0] > stale_ttl:
+            raise
+        print(f"⚠️ {key}: {e.__class__.__name__}, using cached copy from {int(time.time() - hit[0])}s ago",
+              file=sys.stderr)
+        return hit[1], True
+
+    _cache_put(key, value)
+    return value, False
+
+def _get_json_cached(url: str, ttl: float, refresh: bool = False,
+                     stale_ttl: float = ESPN_STALE_TTL) -> Tuple[dict, bool]:
+    """
+    _get_json behind the response cache, keyed by URL (for slow-changing endpoints).
+    Returns (data, stale) like _cached_fetch. refresh=True skips the cached copy
+    and overwrites it.
+    """
+    return _cached_fetch(f"get:{url}", ttl, lambda: _get_json(url), stale_ttl=stale_ttl, refresh=refresh)
 
+_RE_PUNCT = re.compile(r"[^a-z0-9\s]")
+_RE_SUFFIX = re.compile(r"\b(jr|sr|ii|iii|iv|v)\b")
+_RE_INITIAL = re.compile(r"\b[a-z]\b")
+_RE_WS = re.compile(r"\s+")
+
+@functools.lru_cache(maxsize=4096)
 def normalize_player_name(name: str) -> str:
     if not name:
         return ""
     s = name.lower().strip()
-    s = re.sub(r"[^a-z0-9\s]", "", s)
-    s = re.sub(r"\b(jr|sr|ii|iii|iv|v)\b", "", s).strip()
-    s = re.sub(r"\s+", " ", s)
-    return s
+    s = _RE_PUNCT.sub("", s)
+    s = _RE_SUFFIX.sub("", s).strip()
+    s = _RE_WS.sub(" ", s)
+    # interned: index keys, injury-set entries and odds-side lookups share one object
+    return sys.intern(s)
+
+@functools.lru_cache(maxsize=1)
+def run_date() -> str:
+    """
+    UTC date for day-keyed cache entries, fixed at first use so one run uses a
+    single key everywhere (even if it crosses midnight).
+    """
+    return dt.now(timezone.utc).strftime("%Y-%m-%d")
 
+@functools.lru_cache(maxsize=512)
 def format_time_local(iso_time: str) -> str:
+    # many games share a start slot; parse/convert each distinct timestamp once
     try:
         t = dt.fromisoformat(iso_time.replace("Z", "+00:00")).astimezone()
         return t.strftime("%I:%M %p %Z")
@@ -159,25 +410,39 @@ def format_time_local(iso_time: str) -> str:
 # ODDS API
 # =============================================================================
 
+# Shared by both league threads so their per-league pools don't double the burst
+_ODDS_SLOTS = threading.BoundedSemaphore(ODDS_FETCH_WORKERS)
+
 def oddsapi_get_events(sport_key: str) -> list[dict]:
-    url = f"{ODDS_API_BASE}/sports/{sport_key}/events"
-    params = {"apiKey": ODDS_API_KEY}
-    r = requests.get(url, params=params, timeout=25)
-    r.raise_for_status()
-    return r.json()
+    def fetch():
+        url = f"{ODDS_API_BASE}/sports/{sport_key}/events"
+        params = {"apiKey": ODDS_API_KEY}
+        with _ODDS_SLOTS:
+            r = SESSION.get(url, params=params, timeout=25)
+        r.raise_for_status()
+        return _response_json(r)
+
+    events, _stale = _cached_fetch(f"events:{sport_key}", ODDS_EVENTS_TTL, fetch, stale_ttl=ODDS_STALE_TTL)
+    return events
 
 def oddsapi_get_event_odds(sport_key: str, event_id: str, markets: list[str]) -> dict:
-    url = f"{ODDS_API_BASE}/sports/{sport_key}/events/{event_id}/odds"
-    params = {
-        "apiKey": ODDS_API_KEY,
-        "regions": "us,us2",  # broader coverage
-        "markets": ",".join(markets),
-        "oddsFormat": "american",
-        "bookmakers": "draftkings,fanduel,betmgm,pointsbetus,caesars",  # helps avoid empty results
-    }
-    r = requests.get(url, params=params, timeout=30)
-    r.raise_for_status()
-    return r.json()
+    def fetch():
+        url = f"{ODDS_API_BASE}/sports/{sport_key}/events/{event_id}/odds"
+        params = {
+            "apiKey": ODDS_API_KEY,
+            "regions": "us,us2",  # broader coverage
+            "markets": ",".join(markets),
+            "oddsFormat": "american",
+            "bookmakers": "draftkings,fanduel,betmgm,pointsbetus,caesars",  # helps avoid empty results
+        }
+        with _ODDS_SLOTS:
+            r = SESSION.get(url, params=params, timeout=30)
+        r.raise_for_status()
+        return _response_json(r)
+
+    cache_key = f"odds:{sport_key}:{event_id}:{','.join(sorted(markets))}"
+    odds, _stale = _cached_fetch(cache_key, ODDS_EVENT_ODDS_TTL, fetch, stale_ttl=ODDS_STALE_TTL)
+    return odds
 
 def build_games_from_events(events: list[dict]) -> list[dict]:
     games = []
@@ -192,16 +457,43 @@ def build_games_from_events(events: list[dict]) -> list[dict]:
         })
     return games
 
-def parse_player_props(odds_json: dict) -> list[dict]:
+def split_event_odds(odds_json: dict) -> Tuple[dict, dict]:
+    """
+    Splits one combined event-odds payload (main lines + props fetched in a
+    single request) into (main_lines_json, props_json), both shaped like an
+    Odds API response.
+    """
+    main_bms, prop_bms = [], []
+    for bm in odds_json.get("bookmakers", []) or []:
+        main_ms, prop_ms = [], []
+        for m in bm.get("markets", []) or []:
+            if m.get("key") in MAIN_LINE_MARKET_SET:
+                main_ms.append(m)
+            else:
+                prop_ms.append(m)
+        if main_ms:
+            main_bms.append({**bm, "markets": main_ms})
+        if prop_ms:
+            prop_bms.append({**bm, "markets": prop_ms})
+    return {"bookmakers": main_bms}, {"bookmakers": prop_bms}
+
+def parse_player_props(odds_json: dict, wanted_markets: Optional[frozenset] = None) -> list[dict]:
     """
     Returns list of dicts:
       {"market": str, "player": str, "line": float, "over_price": int|None, "under_price": int|None}
+    If wanted_markets is given, other markets are skipped without reading their outcomes.
     """
-    parsed = []
+    # (market, player, line) -> row; dict keeps first-seen order
+    by_key: Dict[Tuple[str, str, float], dict] = {}
     bookmakers = odds_json.get("bookmakers", []) or []
     for bm in bookmakers:
         for m in bm.get("markets", []) or []:
             market_key = m.get("key", "")
+            if not isinstance(market_key, str):
+                continue
+            if wanted_markets is not None and market_key not in wanted_markets:
+                continue
+            market_key = sys.intern(market_key)
             for o in m.get("outcomes", []) or []:
                 player = o.get("description") or ""
                 side = (o.get("name") or "").lower()
@@ -222,18 +514,18 @@ def parse_player_props(odds_json: dict) -> list[dict]:
                     price = None
 
                 key = (market_key, player, line)
-                existing = next((p for p in parsed if (p["market"], p["player"], p["line"]) == key), None)
+                existing = by_key.get(key)
                 if existing is None:
-                    rec = {"market": market_key, "player": player, "line": line, "over_price": None, "under_price": None}
-                    parsed.append(rec)
-                    existing = rec
+                    # interned: the same name repeats across books/markets and is hashed again downstream
+                    existing = {"market": market_key, "player": sys.intern(player), "line": line, "over_price": None, "under_price": None}
+                    by_key[key] = existing
 
                 if side == "over":
                     existing["over_price"] = price
                 else:
                     existing["under_price"] = price
 
-    return parsed
+    return list(by_key.values())
 
 def parse_spread_total(odds_json: dict, home_team: str, away_team: str) -> Tuple[Optional[float], Optional[float], Optional[str]]:
     """
@@ -247,7 +539,8 @@ def parse_spread_total(odds_json: dict, home_team: str, away_team: str) -> Tuple
     try:
         for bm in odds_json.get("bookmakers", []) or []:
             for m in bm.get("markets", []) or []:
-                if m.get("key") == "spreads":
+                k = m.get("key")
+                if k == "spreads":
                     home_spread = None
                     away_spread = None
                     for o in m.get("outcomes", []) or []:
@@ -263,6 +556,8 @@ def parse_spread_total(odds_json: dict, home_team: str, away_team: str) -> Tuple
                             home_spread = pt
                         elif nm == away_team:
                             away_spread = pt
+                        if home_spread is not None and away_spread is not None:
+                            break
 
                     # usually favorite has negative spread
                     if home_spread is not None:
@@ -272,7 +567,7 @@ def parse_spread_total(odds_json: dict, home_team: str, away_team: str) -> Tuple
                         spread_abs = abs(away_spread)
                         favorite = away_team if away_spread < 0 else home_team
 
-                if m.get("key") == "totals":
+                elif k == "totals":
                     for o in m.get("outcomes", []) or []:
                         pt = o.get("point")
                         if pt is None:
@@ -293,9 +588,20 @@ def parse_spread_total(odds_json: dict, home_team: str, away_team: str) -> Tuple
 # ESPN: TEAMS/ROSTERS/INDEX (name->id) with FUZZY MATCHING
 # =============================================================================
 
-def fetch_espn_team_list(league: str) -> list[dict]:
+# league -> parsed team list, shared by the index and injury builders within a run
+_TEAM_LISTS: Dict[str, List[dict]] = {}
+
+def fetch_espn_team_list(league: str, force_refresh: bool = False) -> list[dict]:
+    """
+    Callers must treat the returned list as read-only (it is memoized per league).
+    """
+    if not force_refresh:
+        hit = _TEAM_LISTS.get(league)
+        if hit is not None:
+            return hit
+
     url = ESPN_NBA_TEAMS if league == "nba" else ESPN_NFL_TEAMS
-    data = _get_json(url)
+    data, _stale = _get_json_cached(url, ESPN_TEAMS_TTL, refresh=force_refresh)
     leagues = data.get("sports", [])[0].get("leagues", []) if data.get("sports") else []
     teams = leagues[0].get("teams", []) if leagues else []
     out = []
@@ -306,6 +612,7 @@ def fetch_espn_team_list(league: str) -> list[dict]:
             "name": team.get("displayName"),
             "abbr": team.get("abbreviation"),
         })
+    _TEAM_LISTS[league] = out
     return out
 
 def fetch_roster_for_team(league: str, team_id: str) -> list[dict]:
@@ -325,6 +632,23 @@ def fetch_roster_for_team(league: str, team_id: str) -> list[dict]:
 
     return athletes
 
+def fetch_team_bundle(league: str, team_id: str, force_refresh: bool = False) -> Tuple[dict, bool]:
+    """
+    (team payload, stale): roster and injuries in one request. build_player_index
+    and build_injury_set both read it; the response cache serves the second caller.
+    stale=True means the refetch failed and an older cached copy was returned.
+    """
+    base = ESPN_NBA_TEAMS if league == "nba" else ESPN_NFL_TEAMS
+    url = f"{base}/{team_id}?enable=roster,injuries"
+    return _get_json_cached(url, ESPN_INJURIES_TTL, refresh=force_refresh, stale_ttl=ESPN_INJURIES_STALE_TTL)
+
+def _bundle_roster(data: dict) -> list[dict]:
+    athletes = (data.get("team", {}) or {}).get("athletes", []) or []
+    # usually a flat athlete list; grouped like /roster for some sports
+    if athletes and "items" in athletes[0]:
+        return [a for grp in athletes for a in grp.get("items", []) or []]
+    return athletes
+
 def build_player_index(league: str, force_refresh: bool = False) -> dict:
     """
     Creates dict:
@@ -333,24 +657,43 @@ def build_player_index(league: str, force_refresh: bool = False) -> dict:
     """
     ensure_cache_dir()
     cache = load_json(PLAYER_INDEX_CACHE)
-    today = dt.now(timezone.utc).strftime("%Y-%m-%d")
-    key = f"{league}:{today}"
+    key = f"{league}:{run_date()}"
 
     if not force_refresh and key in cache:
         return cache[key]
 
     idx: Dict[str, dict] = {}
-    teams = fetch_espn_team_list(league)
-    for tm in teams:
-        team_id = tm.get("id")
-        team_abbr = tm.get("abbr") or ""
-        if not team_id:
-            continue
+    team_rows = [(tm["id"], tm.get("abbr") or "") for tm in fetch_espn_team_list(league, force_refresh) if tm.get("id")]
+
+    def _roster(row) -> Tuple[list, bool]:
+        """
+        (roster, failed). failed means a transient error (connection, timeout,
+        5xx), including a stale bundle; a 4xx such as a dead team id is just an
+        empty roster.
+        """
         try:
-            roster = fetch_roster_for_team(league, team_id)
-        except Exception:
-            continue
+            data, stale = fetch_team_bundle(league, row[0], force_refresh)
+            roster = _bundle_roster(data)
+        except Exception as e:
+            if _is_transient(e):
+                # host down or circuit open: /roster is the same family, don't add a second failure
+                return [], True
+            roster, stale = [], False
+        if roster or stale:
+            # a stale roster is fine for this run, but must not go in the day cache
+            return roster, stale
+        try:
+            return fetch_roster_for_team(league, row[0]), False
+        except Exception as e:
+            return [], _is_transient(e)
 
+    # One request per team: fan out, then merge serially in team order (first name wins)
+    with ThreadPoolExecutor(max_workers=ESPN_FETCH_WORKERS) as ex:
+        results = list(ex.map(_roster, team_rows))
+
+    failed = False
+    for (_team_id, team_abbr), (roster, team_failed) in zip(team_rows, results):
+        failed = failed or team_failed
         for a in roster:
             raw_name = a.get("displayName") or a.get("fullName") or ""
             athlete_id = a.get("id") or ""
@@ -360,26 +703,31 @@ def build_player_index(league: str, force_refresh: bool = False) -> dict:
             if nm and nm not in idx:
                 idx[nm] = {"id": athlete_id, "name": raw_name, "team_abbr": team_abbr}
 
-    cache[key] = idx
-    save_json(PLAYER_INDEX_CACHE, cache)
+    # A partial index (a team fetch failed, e.g. circuit open) is used for this run
+    # only; caching it under today's key would hide those teams until tomorrow.
+    if not failed:
+        update_json(PLAYER_INDEX_CACHE, key, idx)
     return idx
 
-def resolve_player_to_espn(normalized_name: str, player_index: dict, cutoff: float = FUZZY_CUTOFF) -> Optional[dict]:
+def resolve_player_to_espn(normalized_name: str, player_index: dict, cutoff: float = FUZZY_CUTOFF,
+                           keys: Optional[List[str]] = None) -> Optional[dict]:
     """
-    Exact match first, then fuzzy match.
+    Exact match first, then fuzzy match. Pass `keys` (list(player_index)) to
+    avoid rebuilding it on every miss.
     """
     if normalized_name in player_index:
         return player_index[normalized_name]
 
-    keys = list(player_index.keys())
+    if keys is None:
+        keys = list(player_index.keys())
     # difflib works well for small-to-medium lists
     hits = difflib.get_close_matches(normalized_name, keys, n=1, cutoff=cutoff)
     if hits:
         return player_index.get(hits[0])
 
     # extra trick: remove middle initials if any
-    s = re.sub(r"\b[a-z]\b", "", normalized_name).strip()
-    s = re.sub(r"\s+", " ", s)
+    s = _RE_INITIAL.sub("", normalized_name).strip()
+    s = _RE_WS.sub(" ", s)
     if s in player_index:
         return player_index[s]
 
@@ -389,78 +737,92 @@ def resolve_player_to_espn(normalized_name: str, player_index: dict, cutoff: flo
 
     return None
 
+# league -> (player index, its key list) currently used by _resolve_player_cached
+_PLAYER_INDEXES: Dict[str, Tuple[dict, List[str]]] = {}
+
+def _set_player_index(league: str, player_index: dict):
+    current = _PLAYER_INDEXES.get(league)
+    if current is None or current[0] is not player_index:
+        _PLAYER_INDEXES[league] = (player_index, list(player_index.keys()))
+        _resolve_player_cached.cache_clear()
+
+@functools.lru_cache(maxsize=4096)
+def _resolve_player_cached(league: str, normalized_name: str) -> Optional[dict]:
+    """
+    Same player shows up once per market, so fuzzy matching is done once per name.
+    """
+    player_index, keys = _PLAYER_INDEXES[league]
+    return resolve_player_to_espn(normalized_name, player_index, keys=keys)
+
 # =============================================================================
 # ESPN: INJURIES
 # =============================================================================
 
-def build_injury_set(league: str, force_refresh: bool = False) -> Tuple[set[str], dict]:
+def _fetch_team_injuries(league: str, team_id: str, force_refresh: bool = False) -> Tuple[list[dict], bool]:
+    """
+    (injuries, failed). failed means a transient error (connection, timeout, 5xx),
+    not that the team has no injuries; a 4xx counts as no data for the team.
+    A stale bundle counts as failed: its list is used for this run only.
+    """
+    try:
+        data, stale = fetch_team_bundle(league, team_id, force_refresh)
+    except Exception as e:
+        return [], _is_transient(e)
+
+    return data.get("team", {}).get("injuries", []) or data.get("injuries", []) or [], stale
+
+def build_injury_set(league: str, force_refresh: bool = False) -> Tuple[frozenset[str], dict]:
     ensure_cache_dir()
     cache = load_json(INJURY_CACHE)
-    today = dt.now(timezone.utc).strftime("%Y-%m-%d")
-    key = f"{league}:{today}"
+    key = f"{league}:{run_date()}"
 
     if not force_refresh and key in cache:
         data = cache[key]
-        return set(data.get("injured", [])), data.get("details", {})
-
-    team_url = ESPN_NBA_TEAMS if league == "nba" else ESPN_NFL_TEAMS
-    teams_data = _get_json(team_url)
+        return frozenset(data.get("injured", [])), data.get("details", {})
 
     injured = set()
     details = {}
 
-    leagues = teams_data.get("sports", [])[0].get("leagues", []) if teams_data.get("sports") else []
-    teams = leagues[0].get("teams", []) if leagues else []
+    # same list build_player_index uses (and the same cached response)
+    team_rows = [(tm["id"], tm.get("abbr") or "") for tm in fetch_espn_team_list(league, force_refresh) if tm.get("id")]
 
-    for t in teams:
-        team = t.get("team", {})
-        team_id = team.get("id")
-        team_abbr = team.get("abbreviation") or ""
-        if not team_id:
-            continue
-
-        base = "https://site.api.espn.com/apis/site/v2/sports/basketball/nba/teams" if league == "nba" \
-            else "https://site.api.espn.com/apis/site/v2/sports/football/nfl/teams"
-        url = f"{base}/{team_id}?enable=injuries"
-
-        try:
-            data = _get_json(url)
-        except Exception:
-            continue
+    # One request per team: fan out, then merge serially in team order
+    with ThreadPoolExecutor(max_workers=ESPN_FETCH_WORKERS) as ex:
+        results = list(ex.map(lambda row: _fetch_team_injuries(league, row[0], force_refresh), team_rows))
 
-        injuries = data.get("team", {}).get("injuries", []) or data.get("injuries", []) or []
+    failed = False
+    for (_team_id, team_abbr), (injuries, team_failed) in zip(team_rows, results):
+        failed = failed or team_failed
         for inj in injuries:
             athlete = inj.get("athlete", {}) or {}
             raw_name = athlete.get("displayName") or ""
-            status = (inj.get("status", {}) or {}).get("name") or inj.get("status") or ""
-            status_upper = str(status).upper()
+            status = str((inj.get("status", {}) or {}).get("name") or inj.get("status") or "")
 
             # if not clearly active, treat as injured (conservative)
-            if any(x in status_upper for x in ["OUT", "INACTIVE", "DOUBTFUL", "IR", "DNP", "SUSP", "PUP"]):
+            if INJURY_STATUS_RE.search(status):
                 nm = normalize_player_name(raw_name)
                 if nm:
                     injured.add(nm)
-                    details[nm] = {"status": str(status), "team_abbr": team_abbr, "raw": raw_name}
+                    details[nm] = {"status": status, "team_abbr": team_abbr, "raw": raw_name}
 
-    cache[key] = {"injured": sorted(list(injured)), "details": details}
-    save_json(INJURY_CACHE, cache)
-    return injured, details
+    # same as the player index: don't pin a partial injury list for the rest of the day
+    if not failed:
+        update_json(INJURY_CACHE, key, {"injured": sorted(list(injured)), "details": details})
+    return frozenset(injured), details
 
 # =============================================================================
 # ESPN: STATS (profile + last10 gamelog fallback)
 # =============================================================================
 
 def fetch_athlete_profile(league: str, athlete_id: str) -> dict:
-    base = "https://site.api.espn.com/apis/site/v2/sports/basketball/nba/athletes" if league == "nba" \
-        else "https://site.api.espn.com/apis/site/v2/sports/football/nfl/athletes"
+    base = ESPN_NBA_ATHLETES if league == "nba" else ESPN_NFL_ATHLETES
     url = f"{base}/{athlete_id}"
     return _get_json(url)
 
 def fetch_athlete_gamelog(league: str, athlete_id: str) -> dict:
     # ESPN gamelog endpoint works like:
     # /athletes/{id}/gamelog
-    base = "https://site.api.espn.com/apis/site/v2/sports/basketball/nba/athletes" if league == "nba" \
-        else "https://site.api.espn.com/apis/site/v2/sports/football/nfl/athletes"
+    base = ESPN_NBA_ATHLETES if league == "nba" else ESPN_NFL_ATHLETES
     url = f"{base}/{athlete_id}/gamelog"
     return _get_json(url)
 
@@ -632,24 +994,73 @@ def _compute_last10_from_gamelog(league: str, gamelog: dict) -> dict:
 
     return out
 
+# PLAYER_STATS_CACHE is loaded once, updated in memory, written by flush_caches()
+_player_stats_cache: Optional[dict] = None
+_player_stats_dirty = False
+_player_stats_lock = threading.Lock()
+
+def _load_player_stats_cache() -> dict:
+    global _player_stats_cache
+    if _player_stats_cache is None:
+        with _player_stats_lock:
+            if _player_stats_cache is None:
+                _player_stats_cache = load_json(PLAYER_STATS_CACHE)
+    return _player_stats_cache
+
+def flush_caches():
+    """
+    Writes cache files that are batched in memory during the run.
+    """
+    global _player_stats_dirty
+    if _player_stats_dirty:
+        ensure_cache_dir()
+        save_json(PLAYER_STATS_CACHE, _load_player_stats_cache())
+        _player_stats_dirty = False
+    prune_response_cache(RESPONSE_CACHE_MAX_AGE)
+
 def get_player_stats(league: str, athlete_id: str, force_refresh: bool = False) -> dict:
     """
-    Cached by date+athlete_id. Returns a stat bundle with keys used by projections.
+    Cached by date+athlete_id (on disk) and per process (one player shows up on
+    many prop rows). Returns a stat bundle with keys used by projections.
+    Raises the RequestException when ESPN couldn't be reached (nothing is cached
+    then, so a later call refetches).
     """
-    ensure_cache_dir()
-    cache = load_json(PLAYER_STATS_CACHE)
-    today = dt.now(timezone.utc).strftime("%Y-%m-%d")
-    key = f"{league}:{today}:{athlete_id}"
+    if force_refresh:
+        return _fetch_player_stats(league, athlete_id)
+    bundle = _load_player_stats_cache().get(f"{league}:{run_date()}:{athlete_id}")
+    if bundle is not None:
+        return bundle
+    return _memo_player_stats(league, athlete_id)
+
+@functools.lru_cache(maxsize=PLAYER_STATS_MEMO_SIZE)
+def _memo_player_stats(league: str, athlete_id: str) -> dict:
+    # _fetch_player_stats raises on a transient error, which lru_cache doesn't keep
+    return _fetch_player_stats(league, athlete_id)
+
+def wait_for_player_stats(league: str) -> bool:
+    """
+    If the league's athlete endpoints are circuit-broken, sleeps until the
+    breaker lets a probe through and returns True; False if it isn't open.
+    """
+    wait = _breaker_wait(ESPN_NBA_ATHLETES if league == "nba" else ESPN_NFL_ATHLETES)
+    if wait is None:
+        return False
+    time.sleep(wait)
+    return True
 
-    if not force_refresh and key in cache:
-        return cache[key]
+def _fetch_player_stats(league: str, athlete_id: str) -> dict:
+    global _player_stats_dirty
+    cache = _load_player_stats_cache()
+    key = f"{league}:{run_date()}:{athlete_id}"
 
     bundle: Dict[str, float] = {}
+    error: Optional[Exception] = None
     try:
         profile = fetch_athlete_profile(league, athlete_id)
         bundle.update(_scan_profile_stats(profile))
-    except Exception:
-        pass
+    except Exception as e:
+        if _is_transient(e):
+            error = e
 
     # If missing key stats, try gamelog last-10
     need_keys = ["ppg", "rpg", "apg"] if league == "nba" else ["pass_yds", "rush_yds", "rec_yds", "rec"]
@@ -657,11 +1068,16 @@ def get_player_stats(league: str, athlete_id: str, force_refresh: bool = False)
         try:
             gl = fetch_athlete_gamelog(league, athlete_id)
             bundle.update(_compute_last10_from_gamelog(league, gl))
-        except Exception:
-            pass
-
+        except Exception as e:
+            if _is_transient(e):
+                error = error or e
+
+    # A transient error (timeout, 5xx, open circuit) must not pin a partial bundle,
+    # on disk or in the per-run memo: raise so the caller can retry later.
+    if error is not None:
+        raise error
     cache[key] = bundle
-    save_json(PLAYER_STATS_CACHE, cache)
+    _player_stats_dirty = True
     return bundle
 
 # =============================================================================
@@ -719,67 +1135,57 @@ def build_context(spread_abs: Optional[float], total_pts: Optional[float], favor
 # PROJECTIONS
 # =============================================================================
 
-def projection_from_stats(league: str, prop_type: str, stats: dict) -> Optional[float]:
-    if league == "nba":
-        ppg = stats.get("ppg")
-        rpg = stats.get("rpg")
-        apg = stats.get("apg")
-        spg = stats.get("spg")
-        bpg = stats.get("bpg")
-        tpg = stats.get("tpg")
-        threes = stats.get("3pm")
-
-        if prop_type == "points": return ppg
-        if prop_type == "rebounds": return rpg
-        if prop_type == "assists": return apg
-        if prop_type == "steals": return spg
-        if prop_type == "blocks": return bpg
-        if prop_type == "turnovers": return tpg
-        if prop_type == "threes": return threes
-
-        if prop_type == "pra":
-            if ppg is None and rpg is None and apg is None: return None
-            return (ppg or 0) + (rpg or 0) + (apg or 0)
-        if prop_type == "pr":
-            if ppg is None and rpg is None: return None
-            return (ppg or 0) + (rpg or 0)
-        if prop_type == "pa":
-            if ppg is None and apg is None: return None
-            return (ppg or 0) + (apg or 0)
-        if prop_type == "ra":
-            if rpg is None and apg is None: return None
-            return (rpg or 0) + (apg or 0)
-
-        # DD/TD: no clean ESPN average, skip unless you want a separate model
-        if prop_type in ("double_double", "triple_double"):
-            return None
+# prop_type -> stat-bundle keys summed for the base projection.
+# Props not listed (e.g. double_double/triple_double) have no clean ESPN average.
+NBA_PROP_STATS = {
+    "points": ("ppg",),
+    "rebounds": ("rpg",),
+    "assists": ("apg",),
+    "steals": ("spg",),
+    "blocks": ("bpg",),
+    "turnovers": ("tpg",),
+    "threes": ("3pm",),
+    "pra": ("ppg", "rpg", "apg"),
+    "pr": ("ppg", "rpg"),
+    "pa": ("ppg", "apg"),
+    "ra": ("rpg", "apg"),
+}
 
-    else:
-        pass_yds = stats.get("pass_yds") or stats.get("pass_yds")
-        pass_tds = stats.get("pass_tds")
-        ints = stats.get("ints")
-        rush_yds = stats.get("rush_yds")
-        rush_tds = stats.get("rush_tds")
-        rec = stats.get("rec")
-        rec_yds = stats.get("rec_yds")
-        rec_tds = stats.get("rec_tds")
-
-        if prop_type == "pass_yards": return pass_yds
-        if prop_type == "pass_tds": return pass_tds
-        if prop_type == "interceptions": return ints
-        if prop_type == "rush_yards": return rush_yds
-        if prop_type == "rush_tds": return rush_tds
-        if prop_type == "receptions": return rec
-        if prop_type == "rec_yards": return rec_yds
-        if prop_type == "rec_tds": return rec_tds
+NFL_PROP_STATS = {
+    "pass_yards": ("pass_yds",),
+    "pass_tds": ("pass_tds",),
+    "interceptions": ("ints",),
+    "rush_yards": ("rush_yds",),
+    "rush_tds": ("rush_tds",),
+    "receptions": ("rec",),
+    "rec_yards": ("rec_yds",),
+    "rec_tds": ("rec_tds",),
+}
 
-    return None
+def projection_from_stats(league: str, prop_type: str, stats: dict) -> Optional[float]:
+    keys = (NBA_PROP_STATS if league == "nba" else NFL_PROP_STATS).get(prop_type)
+    if not keys:
+        return None
+    if len(keys) == 1:
+        return stats.get(keys[0])
+
+    # combos: missing parts count as 0, unless every part is missing
+    vals = [stats.get(k) for k in keys]
+    if all(v is None for v in vals):
+        return None
+    return sum(v or 0 for v in vals)
 
 # =============================================================================
 # ADJUSTMENTS + EDGE
 # =============================================================================
 
-def apply_context_adjustments(league: str, prop_type: str, proj: float, ctx: dict) -> Tuple[float, dict]:
+def context_factors(league: str, prop_type: str, ctx: dict) -> Tuple[Tuple[float, ...], dict]:
+    """
+    The context multipliers (in application order) and breakdown for one prop type.
+    Depends only on (league, prop_type, ctx), so callers can reuse it for every
+    player/line sharing that context.
+    """
+    mults = []
     b = {}
     blowout = float(ctx.get("blowout_risk", 0.2))
     underdog_usage = float(ctx.get("underdog_usage", 0.0))
@@ -788,25 +1194,25 @@ def apply_context_adjustments(league: str, prop_type: str, proj: float, ctx: dic
     # Blowout: volume stats slightly down
     if prop_type in ("points", "rebounds", "assists", "pra", "pr", "pa", "ra", "pass_yards", "rush_yards", "receptions", "rec_yards"):
         mult = 1.0 - 0.06 * blowout
-        proj *= mult
+        mults.append(mult)
         b["Blowout mult"] = round(mult, 3)
 
     # Garbage time: volatile defensive stats slightly up when blowout high
     if blowout >= 0.65 and prop_type in ("steals", "blocks", "turnovers", "interceptions"):
         mult = 1.0 + 0.04
-        proj *= mult
+        mults.append(mult)
         b["Garbage vol"] = +0.04
 
     # Underdog usage bump: stars often handle more
     if underdog_usage > 0 and prop_type in ("points", "assists", "pra", "pa"):
         mult = 1.0 + 0.03 * underdog_usage
-        proj *= mult
+        mults.append(mult)
         b["Underdog usage"] = round(mult, 3)
 
     # Favorite usage spread: slightly lower concentrated usage
     if favorite_usage > 0 and prop_type in ("points", "assists", "pra", "pa"):
         mult = 1.0 - 0.02 * favorite_usage
-        proj *= mult
+        mults.append(mult)
         b["Favorite spread"] = round(mult, 3)
 
     # NFL script
@@ -816,48 +1222,68 @@ def apply_context_adjustments(league: str, prop_type: str, proj: float, ctx: dic
 
         if prop_type == "pass_yards":
             mult = 1.0 - 0.08 * run_heavy + 0.05 * pass_heavy
-            proj *= mult
+            mults.append(mult)
             b["Script pass"] = round(mult, 3)
 
         if prop_type == "rush_yards":
             mult = 1.0 + 0.07 * run_heavy - 0.03 * pass_heavy
-            proj *= mult
+            mults.append(mult)
             b["Script rush"] = round(mult, 3)
 
         if prop_type in ("receptions", "rec_yards"):
             mult = 1.0 + 0.04 * pass_heavy - 0.02 * run_heavy
-            proj *= mult
+            mults.append(mult)
             b["Script rec"] = round(mult, 3)
 
-    return proj, b
+    return tuple(mults), b
+
+def apply_factors(proj: float, mults: Tuple[float, ...]) -> float:
+    # applied one at a time (not pre-multiplied) so results match bit for bit
+    for mult in mults:
+        proj *= mult
+    return proj
 
-def compute_edge_score(proj: float, line: float, prop_type: str) -> Tuple[float, str]:
+def compute_edge_scores(proj: float, line: float, prop_type: str) -> Tuple[float, float]:
     """
-    Returns edge_score 0..100, and preferred side ("over" or "under").
+    Returns (over_score, under_score), each 0..100.
+    The under side mirrors the over side (delta -> -delta), so one sigmoid serves both.
     """
     if line <= 0:
-        return 0.0, "over"
+        return 0.0, 0.0
 
     delta = proj - line
-    side = "over" if delta > 0 else "under"
 
     # Prop-dependent deadzone
     dead = 0.25 if prop_type in ("steals", "blocks", "interceptions", "pass_tds", "rush_tds", "rec_tds") else 0.50
     if abs(delta) < dead:
-        return 0.0, side
+        return 0.0, 0.0
 
     # Scale by line so big lines aren’t overly confident
     scale = max(1.5, line * 0.09)
-    base = 50 + 45 * (2 * sigmoid(delta / scale) - 1)
-    base += clamp(abs(delta) / max(1.0, scale) * 2.0, 0, 8)
+    p = sigmoid(delta / scale)  # sigmoid(-x) == 1 - sigmoid(x)
+    bonus = clamp(abs(delta) / max(1.0, scale) * 2.0, 0, 8)
 
-    return clamp(base, 0, 100), side
+    over = 50 + 45 * (2 * p - 1) + bonus
+    under = 50 + 45 * (1 - 2 * p) + bonus
+    return clamp(over, 0, 100), clamp(under, 0, 100)
 
 # =============================================================================
 # MAIN PICK GENERATION
 # =============================================================================
 
-def generate_picks_for_league(league: str, top_n: int = 12) -> Tuple[List[dict], dict]:
+@dataclass(slots=True)
+class Candidate:
+    player: str
+    prop_type: str
+    side: str
+    line: float
+    proj: float
+    edge_score: float
+    matchup: str
+    time: str
+    breakdown: dict
+
+def generate_picks_for_league(league: str, top_n: int = 12) -> Tuple[List[Candidate], dict]:
     """
     Builds picks across ALL players included in the odds feed for today's events.
     Auto-relaxes threshold if it finds none.
@@ -866,12 +1292,18 @@ def generate_picks_for_league(league: str, top_n: int = 12) -> Tuple[List[dict],
         sport_key = NBA_SPORT_KEY
         markets = NBA_MARKETS
         map_market = NBA_MARKET_TO_PROP
+        prop_stats = NBA_PROP_STATS
     else:
         sport_key = NFL_SPORT_KEY
         markets = NFL_MARKETS
         map_market = NFL_MARKET_TO_PROP
+        prop_stats = NFL_PROP_STATS
+
+    # markets we can actually project (e.g. double_double has no stat average)
+    scorable_markets = frozenset(m for m, pt in map_market.items() if pt in prop_stats)
 
     player_index = build_player_index(league)
+    _set_player_index(league, player_index)
     injured_set, _inj_details = build_injury_set(league)
 
     events = oddsapi_get_events(sport_key)
@@ -882,6 +1314,7 @@ def generate_picks_for_league(league: str, top_n: int = 12) -> Tuple[List[dict],
         "events_with_props_odds": 0,
         "bookmakers_empty": 0,
         "prop_rows_total": 0,
+        "skipped_bad_line": 0,
         "skipped_injured": 0,
         "skipped_no_espn_match": 0,
         "skipped_no_stats": 0,
@@ -889,23 +1322,40 @@ def generate_picks_for_league(league: str, top_n: int = 12) -> Tuple[List[dict],
         "kept": 0,
     }
 
-    candidates: List[dict] = []
+    # Only the best max(top_n, min_picks) can be shown or decide the threshold, so
+    # keep a bounded min-heap of (score, -seq, Candidate) while scoring; -seq makes
+    # ties keep the earlier candidate, same order as a stable sort. Every score is
+    # still recorded for the low-edge count.
+    thresholds = [70, 65, 62, 58, 54, 50]
+    min_picks = max(6, top_n // 2)
+    keep = max(top_n, min_picks)
+    heap: List[Tuple[float, int, Candidate]] = []
+    scores: List[float] = []
+
+    # cleared once a post-cooldown retry of the athlete endpoints fails too
+    retry_stats = True
+
+    # bound once; these run for every prop row
+    map_get = map_market.get
+    index_get = player_index.get
+    injured_contains = injured_set.__contains__
+
+    # One request per event for main lines + props together, fetched for every
+    # event concurrently (network-bound), then scored serially below.
+    event_markets = MAIN_LINE_MARKETS + markets
+    with ThreadPoolExecutor(max_workers=ODDS_FETCH_WORKERS) as ex:
+        futures = {
+            g["id"]: ex.submit(oddsapi_get_event_odds, sport_key, g["id"], event_markets)
+            for g in games if g.get("id")
+        }
 
     for g in games:
         eid = g.get("id")
         if not eid:
             continue
 
-        # spread/total context
-        spread_abs, total_pts, favorite = None, None, None
-        try:
-            main_odds = oddsapi_get_event_odds(sport_key, eid, MAIN_LINE_MARKETS)
-            spread_abs, total_pts, favorite = parse_spread_total(main_odds, g["home_team"], g["away_team"])
-        except Exception:
-            pass
-
         try:
-            odds = oddsapi_get_event_odds(sport_key, eid, markets)
+            main_odds, odds = split_event_odds(futures[eid].result())
         except Exception:
             continue
 
@@ -913,46 +1363,86 @@ def generate_picks_for_league(league: str, top_n: int = 12) -> Tuple[List[dict],
         if not (odds.get("bookmakers") or []):
             dbg["bookmakers_empty"] += 1
 
-        prop_rows = parse_player_props(odds)
+        prop_rows = parse_player_props(odds, scorable_markets)
         dbg["prop_rows_total"] += len(prop_rows)
 
+        # Filter pass (injury / ESPN match / stats) before any game-context work
+        survivors = []
         for row in prop_rows:
-            market = row["market"]
-            prop_type = map_market.get(market)
+            prop_type = map_get(row["market"])
             if not prop_type:
                 continue
 
-            raw_player = row["player"]
-            line = float(row["line"])
-            nm = normalize_player_name(raw_player)
+            line = row["line"]  # already a float (parse_player_props)
+            if line <= 0:
+                # scores 0 either side; don't pay for name matching / stats fetches
+                dbg["skipped_bad_line"] += 1
+                continue
+
+            nm = normalize_player_name(row["player"])
 
             # injury filter
-            if nm in injured_set:
+            if injured_contains(nm):
                 dbg["skipped_injured"] += 1
                 continue
 
-            # ESPN mapping (fuzzy)
-            info = resolve_player_to_espn(nm, player_index)
+            # ESPN mapping: index is keyed by normalized name, fuzzy only on a miss
+            info = index_get(nm)
             if not info:
-                dbg["skipped_no_espn_match"] += 1
-                continue
-
-            athlete_id = info["id"]
-            team_abbr = info.get("team_abbr")
-
-            ctx = build_context(spread_abs, total_pts, favorite, league, g["home_team"] if team_abbr else None)
+                info = _resolve_player_cached(league, nm)
+                if not info:
+                    dbg["skipped_no_espn_match"] += 1
+                    continue
+                # fuzzy hit: the injury report uses the ESPN spelling, so check that too
+                if injured_contains(normalize_player_name(info["name"])):
+                    dbg["skipped_injured"] += 1
+                    continue
 
-            stats = get_player_stats(league, athlete_id)
+            try:
+                stats = get_player_stats(league, info["id"])
+            except requests.RequestException:
+                stats = {}
+                # A short ESPN blip can open the breaker while this serial loop
+                # would fail fast through the rest of the slate: wait it out once
+                # and retry; if the probe fails as well, stop waiting this run.
+                if retry_stats and wait_for_player_stats(league):
+                    try:
+                        stats = get_player_stats(league, info["id"])
+                    except requests.RequestException:
+                        retry_stats = False
             base_proj = projection_from_stats(league, prop_type, stats)
             if base_proj is None:
                 dbg["skipped_no_stats"] += 1
                 continue
 
-            adj_proj, breakdown = apply_context_adjustments(league, prop_type, float(base_proj), ctx)
+            survivors.append((prop_type, line, info, float(base_proj)))
+
+        if not survivors:
+            continue
+
+        # spread/total context
+        spread_abs, total_pts, favorite = parse_spread_total(main_odds, g["home_team"], g["away_team"])
+
+        # ctx depends only on the game and whether the player has a team: build both once
+        ctx_team = build_context(spread_abs, total_pts, favorite, league, g["home_team"])
+        ctx_no_team = build_context(spread_abs, total_pts, favorite, league, None)
+
+        # every player sharing a (prop_type, ctx) gets the same multipliers/breakdown
+        factors: Dict[Tuple[str, bool], Tuple[Tuple[float, ...], dict]] = {}
+        matchup, game_time = g["matchup"], g["time"]
+
+        for prop_type, line, info, base_proj in survivors:
+            has_team = bool(info.get("team_abbr"))
+            fkey = (prop_type, has_team)
+            f = factors.get(fkey)
+            if f is None:
+                f = factors[fkey] = context_factors(league, prop_type, ctx_team if has_team else ctx_no_team)
+            mults, breakdown = f
+
+            adj_proj = apply_factors(base_proj, mults)
 
             # Score both sides
-            over_score, _ = compute_edge_score(adj_proj, line, prop_type)
-            under_score, _ = compute_edge_score(line - (adj_proj - line), line, prop_type)  # symmetric under edge
+            over_score, under_score = compute_edge_scores(adj_proj, line, prop_type)
 
             # choose best side
             if over_score >= under_score:
@@ -962,38 +1452,38 @@ def generate_picks_for_league(league: str, top_n: int = 12) -> Tuple[List[dict],
                 score = under_score
                 side = "under"
 
-            candidates.append({
-                "player": info["name"],
-                "prop_type": prop_type,
-                "side": side,
-                "line": line,
-                "proj": adj_proj,
-                "edge_score": score,
-                "matchup": g["matchup"],
-                "time": g["time"],
-                "breakdown": breakdown,
-            })
+            seq = len(scores)
+            scores.append(score)
+            full = len(heap) >= keep
+            if full and score <= heap[0][0]:
+                continue  # can't make the top list; don't build a Candidate
+            entry = (score, -seq, Candidate(info["name"], prop_type, side, line, adj_proj, score,
+                                            matchup, game_time, breakdown))
+            if full:
+                heapq.heapreplace(heap, entry)
+            else:
+                heapq.heappush(heap, entry)
 
     # Auto-relax threshold so you don't get blank dashboards
-    thresholds = [70, 65, 62, 58, 54, 50]
-    picks: List[dict] = []
     used_threshold = thresholds[-1]
+    top = [c for _score, _seq, c in sorted(heap, reverse=True)]
 
-    candidates.sort(key=lambda x: x["edge_score"], reverse=True)
-
+    # top is descending; on the negated scores bisect gives "how many >= t"
+    neg_scores = [-c.edge_score for c in top]
+    cut = 0
     for t in thresholds:
-        picks = [c for c in candidates if c["edge_score"] >= t]
+        cut = bisect.bisect_right(neg_scores, -t)
         used_threshold = t
-        if len(picks) >= max(6, top_n // 2):
+        if cut >= min_picks:
             break
 
-    picks = picks[:top_n]
+    picks = top[:min(cut, top_n)]
     dbg["kept"] = len(picks)
     dbg["used_threshold"] = used_threshold
-    dbg["candidate_count"] = len(candidates)
+    dbg["candidate_count"] = len(scores)
 
     # Count "low edge" skips relative to final threshold
-    dbg["skipped_low_edge"] = max(0, len(candidates) - len([c for c in candidates if c["edge_score"] >= used_threshold]))
+    dbg["skipped_low_edge"] = sum(1 for sc in scores if sc < used_threshold)
 
     return picks, dbg
 
@@ -1001,105 +1491,46 @@ def generate_picks_for_league(league: str, top_n: int = 12) -> Tuple[List[dict],
 # HTML
 # =============================================================================
 
-def generate_factor_html(breakdown: dict) -> str:
-    # Show a few helpful adjustments
-    items = list(breakdown.items())[:6]
-    html = '<div class="factor-breakdown">'
-    for name, val in items:
-        try:
-            vv = float(val)
-        except Exception:
-            vv = 0.0
-        norm = int(clamp(50 + vv * 120, 0, 100))
-        if norm >= 75:
-            grad = "linear-gradient(90deg, #00ff88, #00cc66)"
-        elif norm >= 50:
-            grad = "linear-gradient(90deg, #00d4ff, #0099ff)"
-        else:
-            grad = "linear-gradient(90deg, #ffaa00, #ff8800)"
-        html += f"""
-        <div class="factor-item">
-          <div class="factor-name">{name}</div>
-          <div class="factor-score-bar">
-            <div class="factor-score-fill" style="width:{norm}%; background:{grad};">{norm}</div>
-          </div>
-        </div>"""
-    html += "</div>"
-    return html
-
-def card(p: dict) -> str:
-    e = float(p["edge_score"])
-    conf = "high" if e >= 80 else ("medium" if e >= 70 else "low")
-    badge = f"{int(e)} EDGE"
-    title = f"{p['player']} — {p['prop_type'].replace('_',' ').upper()} {p['side'].upper()} {p['line']}"
-    subtitle = f"{p['matchup']} | {p['time']} | proj {p['proj']:.2f}"
-    return f"""
-    <div class="prediction-card {conf}-confidence">
-      <div class="prediction-header">
-        <div>
-          <div class="prediction-title">{title}</div>
-          <div class="prediction-sub">{subtitle}</div>
-        </div>
-        <div class="confidence-badge {conf}">{badge}</div>
-      </div>
-      {generate_factor_html(p["breakdown"])}
-    </div>
-    """
-
-def generate_html(nba_picks: list[dict], nfl_picks: list[dict], nba_dbg: dict, nfl_dbg: dict) -> str:
-    now = dt.now().astimezone()
-    updated = now.strftime("%B %d, %Y at %I:%M %p %Z")
-
-    nba_cards = "".join(card(p) for p in nba_picks) if nba_picks else "<p>No picks returned.</p>"
-    nfl_cards = "".join(card(p) for p in nfl_picks) if nfl_picks else "<p>No picks returned.</p>"
-
-    dbg_block = f"""
-    <details style="margin-top:16px;color:#cbd5e1;">
-      <summary style="cursor:pointer;font-weight:900;">Debug summary (why picks may be low)</summary>
-      <pre style="white-space:pre-wrap;background:#0b1226;border:1px solid #2d3748;border-radius:10px;padding:12px;margin-top:10px;">
-NBA: {json.dumps(nba_dbg, indent=2)}
-NFL: {json.dumps(nfl_dbg, indent=2)}
-      </pre>
-    </details>
-    """
-
-    return f"""<!DOCTYPE html>
+# Static page shell, written around the dynamic parts by write_html
+HTML_HEAD = """<!DOCTYPE html>
 <html>
 <head>
 <meta charset="UTF-8"/>
 <meta name="viewport" content="width=device-width, initial-scale=1.0"/>
 <title>Prop Dashboard</title>
 <style>
-:root {{
+:root {
   --bg:#0a0e27; --surface:#1a1f3a; --border:#2d3748; --text:#f1f5f9; --muted:#cbd5e1;
-}}
-*{{box-sizing:border-box}}
-body{{margin:0;padding:20px;font-family:system-ui,-apple-system,Segoe UI,Roboto;background:linear-gradient(135deg,var(--bg),#0f1729);color:var(--text)}}
-.header{{text-align:center;border-bottom:2px solid var(--border);padding-bottom:12px;margin-bottom:18px}}
-h1{{margin:0;font-size:2rem;background:linear-gradient(135deg,#00d4ff,#0099ff);-webkit-background-clip:text;-webkit-text-fill-color:transparent}}
-small{{color:var(--muted)}}
-.tabs{{display:flex;gap:10px;justify-content:center;margin:16px 0}}
-.tab{{padding:10px 16px;border:2px solid var(--border);background:transparent;color:var(--text);border-radius:12px;font-weight:900;cursor:pointer}}
-.tab.active{{background:linear-gradient(135deg,#00d4ff,#0099ff);border-color:#00d4ff;color:#000}}
-.section{{display:none;max-width:1400px;margin:0 auto}}
-.section.active{{display:block}}
-.prediction-card{{background:var(--surface);border:2px solid var(--border);border-radius:14px;padding:14px;margin:12px 0}}
-.prediction-header{{display:flex;justify-content:space-between;gap:12px}}
-.prediction-title{{font-weight:1000;font-size:1.05rem}}
-.prediction-sub{{color:var(--muted);font-size:0.9rem;margin-top:6px}}
-.confidence-badge{{padding:8px 12px;border-radius:999px;font-weight:1000;color:#fff;white-space:nowrap}}
-.confidence-badge.high{{background:linear-gradient(135deg,#00ff88,#00cc66)}}
-.confidence-badge.medium{{background:linear-gradient(135deg,#ffaa00,#ff8800)}}
-.confidence-badge.low{{background:linear-gradient(135deg,#ff6b6b,#cc0000)}}
-.factor-breakdown{{display:grid;grid-template-columns:repeat(auto-fit,minmax(240px,1fr));gap:10px;margin-top:12px}}
-.factor-item{{background:rgba(0,212,255,0.05);border:1px solid rgba(0,212,255,0.2);padding:10px;border-radius:10px}}
-.factor-name{{font-size:0.78rem;font-weight:1000;color:#00d4ff;text-transform:uppercase}}
-.factor-score-bar{{height:18px;border-radius:6px;background:rgba(0,0,0,0.3);overflow:hidden;margin-top:6px}}
-.factor-score-fill{{height:100%;display:flex;align-items:center;justify-content:center;font-size:0.75rem;font-weight:1000;color:#000}}
+}
+*{box-sizing:border-box}
+body{margin:0;padding:20px;font-family:system-ui,-apple-system,Segoe UI,Roboto;background:linear-gradient(135deg,var(--bg),#0f1729);color:var(--text)}
+.header{text-align:center;border-bottom:2px solid var(--border);padding-bottom:12px;margin-bottom:18px}
+h1{margin:0;font-size:2rem;background:linear-gradient(135deg,#00d4ff,#0099ff);-webkit-background-clip:text;-webkit-text-fill-color:transparent}
+small{color:var(--muted)}
+.tabs{display:flex;gap:10px;justify-content:center;margin:16px 0}
+.tab{padding:10px 16px;border:2px solid var(--border);background:transparent;color:var(--text);border-radius:12px;font-weight:900;cursor:pointer}
+.tab.active{background:linear-gradient(135deg,#00d4ff,#0099ff);border-color:#00d4ff;color:#000}
+.section{display:none;max-width:1400px;margin:0 auto}
+.section.active{display:block}
+.prediction-card{background:var(--surface);border:2px solid var(--border);border-radius:14px;padding:14px;margin:12px 0}
+.prediction-header{display:flex;justify-content:space-between;gap:12px}
+.prediction-title{font-weight:1000;font-size:1.05rem}
+.prediction-sub{color:var(--muted);font-size:0.9rem;margin-top:6px}
+.confidence-badge{padding:8px 12px;border-radius:999px;font-weight:1000;color:#fff;white-space:nowrap}
+.confidence-badge.high{background:linear-gradient(135deg,#00ff88,#00cc66)}
+.confidence-badge.medium{background:linear-gradient(135deg,#ffaa00,#ff8800)}
+.confidence-badge.low{background:linear-gradient(135deg,#ff6b6b,#cc0000)}
+.factor-breakdown{display:grid;grid-template-columns:repeat(auto-fit,minmax(240px,1fr));gap:10px;margin-top:12px}
+.factor-item{background:rgba(0,212,255,0.05);border:1px solid rgba(0,212,255,0.2);padding:10px;border-radius:10px}
+.factor-name{font-size:0.78rem;font-weight:1000;color:#00d4ff;text-transform:uppercase}
+.factor-score-bar{height:18px;border-radius:6px;background:rgba(0,0,0,0.3);overflow:hidden;margin-top:6px}
+.factor-score-fill{height:100%;display:flex;align-items:center;justify-content:center;font-size:0.75rem;font-weight:1000;color:#000}
 </style>
 </head>
 <body>
-  <div class="header">
+"""
+
+HTML_HEADER_TEMPLATE = """  <div class="header">
     <h1>Automated Prop Scouting Dashboard</h1>
     <small>Last updated: {updated}</small>
     <div class="tabs">
@@ -1107,35 +1538,138 @@ small{{color:var(--muted)}}
       <button class="tab" data-tab="nfl">🏈 NFL</button>
     </div>
   </div>
+"""
 
-  <div id="nba" class="section active">
-    <h2>NBA Best Value (Over/Under)</h2>
-    {nba_cards}
-  </div>
-
-  <div id="nfl" class="section">
-    <h2>NFL Best Value (Over/Under)</h2>
-    {nfl_cards}
-  </div>
+HTML_SECTION_OPEN_TEMPLATE = """
+  <div id="{key}" class="{css_class}">
+    <h2>{label} Best Value (Over/Under)</h2>
+    """
 
+HTML_DEBUG_OPEN = """
   <div style="max-width:1400px;margin:0 auto;">
-    {dbg_block}
+    """
+
+HTML_BLOCK_CLOSE = """
   </div>
+"""
 
+HTML_TAIL = """
 <script>
-document.querySelectorAll(".tab").forEach(btn => {{
-  btn.addEventListener("click", () => {{
+document.querySelectorAll(".tab").forEach(btn => {
+  btn.addEventListener("click", () => {
     document.querySelectorAll(".tab").forEach(b => b.classList.remove("active"));
     document.querySelectorAll(".section").forEach(s => s.classList.remove("active"));
     btn.classList.add("active");
     document.getElementById(btn.dataset.tab).classList.add("active");
-  }});
-}});
+  });
+});
 </script>
 </body>
 </html>
 """
 
+HTML_CARD_TEMPLATE = """
+    <div class="prediction-card {conf}-confidence">
+      <div class="prediction-header">
+        <div>
+          <div class="prediction-title">{title}</div>
+          <div class="prediction-sub">{subtitle}</div>
+        </div>
+        <div class="confidence-badge {conf}">{badge}</div>
+      </div>
+      {factors}
+    </div>
+    """
+
+HTML_FACTOR_ITEM_TEMPLATE = """
+        <div class="factor-item">
+          <div class="factor-name">{name}</div>
+          <div class="factor-score-bar">
+            <div class="factor-score-fill" style="width:{norm}%; background:{grad};">{norm}</div>
+          </div>
+        </div>"""
+
+# Card title pieces for the fixed prop-type/side vocabulary
+PROP_DISPLAY = {pt: pt.replace("_", " ").upper()
+                for pt in itertools.chain(NBA_MARKET_TO_PROP.values(), NFL_MARKET_TO_PROP.values())}
+SIDE_DISPLAY = {"over": "OVER", "under": "UNDER"}
+
+# bisect_right(thresholds, x) -> index into levels
+CONFIDENCE_THRESHOLDS = (70, 80)  # card edge score
+FACTOR_THRESHOLDS = (50, 75)  # factor bar width
+LEVELS = ("low", "medium", "high")
+
+FACTOR_GRADIENTS = {
+    "high": "linear-gradient(90deg, #00ff88, #00cc66)",
+    "medium": "linear-gradient(90deg, #00d4ff, #0099ff)",
+    "low": "linear-gradient(90deg, #ffaa00, #ff8800)",
+}
+
+@functools.lru_cache(maxsize=1024)
+def _factor_item_html(name: str, val: Any) -> str:
+    """
+    One factor row. The same (name, value) pairs repeat across every card in a
+    game (the breakdowns come from a per-game cache), so render each once.
+    """
+    try:
+        vv = float(val)
+    except Exception:
+        vv = 0.0
+    norm = int(clamp(50 + vv * 120, 0, 100))
+    grad = FACTOR_GRADIENTS[LEVELS[bisect.bisect_right(FACTOR_THRESHOLDS, norm)]]
+    return HTML_FACTOR_ITEM_TEMPLATE.format(name=name, norm=norm, grad=grad)
+
+def generate_factor_html(breakdown: dict) -> str:
+    # Show a few helpful adjustments
+    parts = ['<div class="factor-breakdown">']
+    for name, val in itertools.islice(breakdown.items(), 6):
+        parts.append(_factor_item_html(name, val))
+    parts.append("</div>")
+    return "".join(parts)
+
+def card(p: Candidate) -> str:
+    e = float(p.edge_score)
+    conf = LEVELS[bisect.bisect_right(CONFIDENCE_THRESHOLDS, e)]
+    badge = f"{int(e)} EDGE"
+    prop_label = PROP_DISPLAY.get(p.prop_type) or p.prop_type.replace("_", " ").upper()
+    title = f"{p.player} — {prop_label} {SIDE_DISPLAY.get(p.side) or p.side.upper()} {p.line}"
+    subtitle = f"{p.matchup} | {p.time} | proj {p.proj:.2f}"
+    return HTML_CARD_TEMPLATE.format(conf=conf, title=title, subtitle=subtitle, badge=badge,
+                                     factors=generate_factor_html(p.breakdown))
+
+def write_html(f, nba_picks: List[Candidate], nfl_picks: List[Candidate], nba_dbg: dict, nfl_dbg: dict):
+    """
+    Streams the page to `f` section by section instead of building one big string.
+    """
+    now = dt.now().astimezone()
+    updated = now.strftime("%B %d, %Y at %I:%M %p %Z")
+
+    f.write(HTML_HEAD)
+    f.write(HTML_HEADER_TEMPLATE.format(updated=updated))
+
+    for key, css_class, label, picks in (("nba", "section active", "NBA", nba_picks),
+                                         ("nfl", "section", "NFL", nfl_picks)):
+        f.write(HTML_SECTION_OPEN_TEMPLATE.format(key=key, css_class=css_class, label=label))
+        if picks:
+            for p in picks:
+                f.write(card(p))
+        else:
+            f.write("<p>No picks returned.</p>")
+        f.write(HTML_BLOCK_CLOSE)
+
+    f.write(HTML_DEBUG_OPEN)
+    f.write(f"""
+    <details style="margin-top:16px;color:#cbd5e1;">
+      <summary style="cursor:pointer;font-weight:900;">Debug summary (why picks may be low)</summary>
+      <pre style="white-space:pre-wrap;background:#0b1226;border:1px solid #2d3748;border-radius:10px;padding:12px;margin-top:10px;">
+NBA: {json.dumps(nba_dbg, indent=2)}
+NFL: {json.dumps(nfl_dbg, indent=2)}
+      </pre>
+    </details>
+    """)
+    f.write(HTML_BLOCK_CLOSE)
+    f.write(HTML_TAIL)
+
 # =============================================================================
 # MAIN
 # =============================================================================
@@ -1145,15 +1679,22 @@ def main():
     print("🚀 Starting dashboard generation...")
     print(f"⏰ {dt.now(timezone.utc).strftime('%Y-%m-%d %H:%M:%S UTC')}")
 
-    nba_picks, nba_dbg = generate_picks_for_league("nba", top_n=12)
-    nfl_picks, nfl_dbg = generate_picks_for_league("nfl", top_n=12)
-
-    print("DEBUG NBA:", json.dumps(nba_dbg, indent=2))
-    print("DEBUG NFL:", json.dumps(nfl_dbg, indent=2))
-
-    html = generate_html(nba_picks, nfl_picks, nba_dbg, nfl_dbg)
-    with open("AI_Prediction_Engine.html", "w", encoding="utf-8") as f:
-        f.write(html)
+    try:
+        # Leagues share nothing but caches and are mostly network wait: run them together
+        with ThreadPoolExecutor(max_workers=LEAGUE_WORKERS) as ex:
+            nba_fut = ex.submit(generate_picks_for_league, "nba", top_n=12)
+            nfl_fut = ex.submit(generate_picks_for_league, "nfl", top_n=12)
+            nba_picks, nba_dbg = nba_fut.result()
+            nfl_picks, nfl_dbg = nfl_fut.result()
+    finally:
+        flush_caches()
+
+    if os.getenv("DASH_DEBUG"):
+        print("DEBUG NBA:", json.dumps(nba_dbg, indent=2), file=sys.stderr)
+        print("DEBUG NFL:", json.dumps(nfl_dbg, indent=2), file=sys.stderr)
+
+    with open("AI_Prediction_Engine.html", "w", encoding="utf-8", buffering=1 << 20) as f:
+        write_html(f, nba_picks, nfl_picks, nba_dbg, nfl_dbg)
 
     print("✅ Wrote AI_Prediction_Engine.html")
     print(f"NBA picks: {len(nba_picks)} | NFL picks: {len(nfl_picks)}")
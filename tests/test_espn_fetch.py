@@ -0,0 +1,136 @@
+import os
+
+import pytest
+import requests
+
+os.environ.setdefault("ODDS_API_KEY", "test")
+
+import generate_dashboard as g  # noqa: E402
+
+PLAYERS = [f"Player {chr(ord('A') + i)}" for i in range(20)]
+
+
+class FakeResponse:
+    status_code = 200
+
+    def __init__(self, data):
+        self._data = data
+        self.content = g.json.dumps(data).encode("utf-8")
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.HTTPError(f"{self.status_code}", response=self)
+
+    def json(self):
+        return self._data
+
+
+def _stat(abbr, value):
+    return {"abbreviation": abbr, "value": value}
+
+
+def _payload(url):
+    if url.endswith("/events"):
+        return [{"id": "ev1", "home_team": "Home", "away_team": "Away", "commence_time": "2026-10-16T23:00:00Z"}]
+    if url.endswith("/odds"):
+        markets = [
+            {"key": market, "outcomes": [
+                {"description": name, "name": side, "point": 15.5, "price": -110}
+                for name in PLAYERS for side in ("Over", "Under")
+            ]}
+            for market in ("player_points", "player_rebounds")
+        ]
+        return {"bookmakers": [{"key": "draftkings", "markets": markets}]}
+    if url == g.ESPN_NBA_TEAMS:
+        teams = [{"id": "1", "displayName": "Home", "abbreviation": "HOM"},
+                 {"id": "404", "displayName": "Gone", "abbreviation": "GON"}]
+        return {"sports": [{"leagues": [{"teams": [{"team": t} for t in teams]}]}]}
+    if "/teams/1" in url:
+        return {"team": {"athletes": [{"id": str(i), "displayName": name} for i, name in enumerate(PLAYERS)]}}
+    if "/athletes/" in url:
+        i = int(url.rsplit("/athletes/", 1)[1].split("/")[0])
+        return {"statistics": [{"categories": [{"stats": [_stat("PPG", 20 + i), _stat("RPG", 5 + i)]}]}]}
+    raise AssertionError(f"unexpected url {url}")
+
+
+@pytest.fixture
+def espn(monkeypatch, tmp_path):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(g, "BREAKER_COOLDOWN", 0.05)
+    monkeypatch.setattr(g, "_player_stats_cache", None)
+    for state in (g._BREAKER, g._RESPONSE_CACHE, g._TEAM_LISTS, g._PLAYER_INDEXES):
+        state.clear()
+    g._memo_player_stats.cache_clear()
+    g._resolve_player_cached.cache_clear()
+
+    state = {"left": 0, "bundles_down": False}
+
+    def get(url, params=None, timeout=None):
+        if "/athletes/" in url and state["left"]:
+            state["left"] -= 1
+            raise requests.Timeout(f"timed out: {url}")
+        status = 404 if "/teams/404" in url else 503 if state["bundles_down"] and "enable=" in url else 200
+        if status != 200:
+            r = FakeResponse({})
+            r.status_code = status
+            return r
+        return FakeResponse(_payload(url))
+
+    monkeypatch.setattr(g.SESSION, "get", get)
+    return state
+
+
+def test_breaker_key_is_per_league_and_endpoint_family():
+    nba_athletes = g._breaker_key(f"{g.ESPN_NBA_ATHLETES}/1/gamelog")
+    assert nba_athletes == g._breaker_key(f"{g.ESPN_NBA_ATHLETES}/2")
+    assert nba_athletes != g._breaker_key(f"{g.ESPN_NFL_ATHLETES}/1")
+    assert nba_athletes != g._breaker_key(f"{g.ESPN_NBA_TEAMS}/1?enable=roster,injuries")
+    assert g._breaker_key(g.ESPN_NBA_TEAMS) == g._breaker_key(f"{g.ESPN_NBA_TEAMS}/1/roster")
+
+
+def test_short_athlete_timeout_run_does_not_empty_the_slate(espn):
+    # enough consecutive timeouts to open the athletes breaker
+    espn["left"] = g.BREAKER_FAILURES
+
+    picks, dbg = g.generate_picks_for_league("nba")
+
+    # Profile + gamelog timeouts for the first two players' points rows, then the
+    # breaker opens on the third; the loop waits out the cooldown and continues.
+    # The two players' rebounds rows refetch: a failed bundle isn't memoized.
+    assert dbg["skipped_no_stats"] == 2
+    assert dbg["candidate_count"] == 2 * len(PLAYERS) - 2
+    assert picks and dbg["kept"] == len(picks)
+    assert g._breaker_wait(g.ESPN_NBA_ATHLETES) is None
+    assert g._breaker_wait(g.ESPN_NFL_ATHLETES) is None
+
+
+def test_failed_stats_fetch_is_not_cached(espn):
+    espn["left"] = 1
+
+    with pytest.raises(requests.Timeout):
+        g.get_player_stats("nba", "3")
+    assert g.get_player_stats("nba", "3") == {"ppg": 23.0, "rpg": 8.0}
+
+
+def test_dead_team_id_still_writes_day_caches(espn):
+    # team 404 answers 404 on every endpoint: no data, but not a failed fetch
+    idx = g.build_player_index("nba")
+    injured, _details = g.build_injury_set("nba")
+
+    assert len(idx) == len(PLAYERS)
+    key = f"nba:{g.run_date()}"
+    assert key in g.load_json(g.PLAYER_INDEX_CACHE)
+    assert key in g.load_json(g.INJURY_CACHE)
+
+
+def test_stale_injury_bundle_is_not_written_to_day_cache(espn):
+    url = f"{g.ESPN_NBA_TEAMS}/1?enable=roster,injuries"
+    old = {"team": {"injuries": [{"athlete": {"displayName": "Player A"}, "status": {"name": "Out"}}]}}
+    g.ensure_cache_dir()
+    g.save_json(g._cache_path(f"get:{url}"), {"_fetched_at": g.time.time() - 3600, "value": old})
+    espn["bundles_down"] = True
+
+    injured, _details = g.build_injury_set("nba")
+
+    assert injured == {"player a"}  # the stale list is still used for this run
+    assert f"nba:{g.run_date()}" not in g.load_json(g.INJURY_CACHE)